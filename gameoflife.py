@@ -2,13 +2,44 @@ from __future__ import annotations
 
 import argparse
 import sys
-from typing import List, Tuple
+from typing import Optional, Tuple
+
+import numpy as np
+from numba import njit, prange
 
 # Hide pygame import text
 import os
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 import pygame as pg
 
+BACKGROUND_COLOUR = (147, 147, 147)
+LIVE_CELL_COLOUR = (255, 255, 0)
+GRID_LINE_COLOUR = (180, 180, 180)
+
+
+@njit(cache=True, parallel=True)
+def _evolve(grid: np.ndarray, out: np.ndarray) -> None:
+    """Write the next generation of `grid` into `out`, with rows processed
+    in parallel. Cells outside the grid are treated as dead.
+
+    Args:
+        grid: Current grid state.
+        out: Buffer for the next grid state.
+    """
+    rows, columns = grid.shape
+    for i in prange(rows):
+        i_start = i - 1 if i > 0 else 0
+        i_stop = i + 2 if i < rows - 1 else rows
+        for j in range(columns):
+            j_start = j - 1 if j > 0 else 0
+            j_stop = j + 2 if j < columns - 1 else columns
+            neighbours = 0
+            for l in range(i_start, i_stop):
+                for m in range(j_start, j_stop):
+                    neighbours += grid[l, m]
+            neighbours -= grid[i, j]
+            out[i, j] = 1 if neighbours == 3 or (grid[i, j] and neighbours == 2) else 0
+
 
 class GameOfLife:
     """Conway's Game of Life. Run by instantiating and calling the `run`
@@ -24,22 +55,55 @@ class GameOfLife:
         fps: Maximum frame rate.
         fullscreen: Whether the game should be played in fullscreen.
     """
-    BACKGROUND_COLOUR = (147, 147, 147)
-    LIVE_CELL_COLOUR = (255, 255, 0)
-    GRID_LINE_COLOUR = (180, 180, 180)
-
     def __init__(self, window_size: int, grid_size: int, evolution_rate: float,
                  fps: float, fullscreen: bool) -> None:
         pg.init()
         pg.display.set_caption("Conway's Game of Life")
+        # Only the event types the game handles are allowed onto the queue,
+        # so unused events are dropped by SDL instead of filtered in Python.
+        pg.event.set_blocked(None)
+        pg.event.set_allowed([pg.QUIT, pg.KEYDOWN, pg.MOUSEMOTION, pg.MOUSEBUTTONDOWN])
         self.window_size = window_size if not fullscreen else pg.display.Info().current_h
         self.grid_size = grid_size
         self.cell_size = window_size // grid_size
         self.fps = fps
         self.evolution_rate = evolution_rate
-        self.grid_state = [[False for _ in range(grid_size)] for _ in range(grid_size)]
+        self.grid_state = np.zeros((grid_size, grid_size), dtype=np.uint8)
+        self._next_grid_state = np.zeros_like(self.grid_state)
+        # The grid state currently drawn to the display, used to redraw only
+        # the cells which changed.
+        self._drawn_grid_state = np.zeros_like(self.grid_state)
+        # Compile the evolution kernel up front so that the first evolution
+        # step isn't slow. evolve_grid calls it with both full arrays and
+        # non-contiguous bounding-box views, which compile as separate
+        # specializations, so warm up one of each.
+        _evolve(self.grid_state, self._next_grid_state)
+        _evolve(self.grid_state[:-1, :-1], self._next_grid_state[:-1, :-1])
         self.surface = pg.display.set_mode((window_size, window_size), fullscreen * pg.FULLSCREEN)
         self.clock = pg.time.Clock()
+        self._cell_rects = [
+            [pg.Rect(j * self.cell_size, i * self.cell_size, self.cell_size, self.cell_size)
+             for j in range(grid_size)]
+            for i in range(grid_size)
+        ]
+        # The cached surfaces are converted to the display format so that
+        # blitting them doesn't convert pixels on the fly.
+        self._live_cell_surface = pg.Surface((self.cell_size, self.cell_size)).convert()
+        self._live_cell_surface.fill(LIVE_CELL_COLOUR)
+        self._grid_line_overlay = self._render_grid_lines().convert_alpha()
+        # One-pixel-per-cell image of the grid, scaled up to the grid's size
+        # on screen in a single pass when drawing.
+        self._cell_colours = np.array([BACKGROUND_COLOUR, LIVE_CELL_COLOUR],
+                                      dtype=np.uint8)
+        self._cell_surface = pg.Surface((grid_size, grid_size)).convert()
+        grid_pixel_size = grid_size * self.cell_size
+        self._scaled_cell_surface = pg.Surface((grid_pixel_size, grid_pixel_size)).convert()
+        # Preallocated buffers for the per-frame paths, so that drawing and
+        # evolving don't allocate fresh arrays every tick.
+        self._cell_rgb = np.empty((grid_size, grid_size, 3), dtype=np.uint8)
+        self._changed_mask = np.empty((grid_size, grid_size), dtype=bool)
+        self._live_row_mask = np.empty(grid_size, dtype=bool)
+        self._live_column_mask = np.empty(grid_size, dtype=bool)
 
     def run(self) -> None:
         """Set up the grid by clicking and dragging over cells. Start the
@@ -50,10 +114,24 @@ class GameOfLife:
     def set_up_grid(self) -> None:
         """Set up the initial grid state by selecting live squares with the
         mouse. Exit the set up by pressing space."""
-        update_screen = False
+        self.surface.fill(BACKGROUND_COLOUR)
+        self.draw_grid_lines()
+        pg.display.update()
+
+        # Bind the names used every iteration to locals to avoid the repeated
+        # attribute lookups in the loop.
+        event_get = pg.event.get
+        display_update = pg.display.update
+        grid_state = self.grid_state
+        position_to_cell = self.position_to_cell
+        redraw_cell = self.redraw_cell
+        clock_tick = self.clock.tick
+        fps = self.fps
+
+        hovered_cell: Optional[Tuple[int, int]] = None
         done = False
         while not done:
-            for event in pg.event.get():
+            for event in event_get((pg.QUIT, pg.KEYDOWN, pg.MOUSEBUTTONDOWN)):
                 if event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
                     pg.quit()
                     sys.exit()
@@ -61,31 +139,39 @@ class GameOfLife:
                 elif event.type == pg.KEYDOWN and event.key == pg.K_SPACE:
                     done = True
 
-                elif event.type == pg.MOUSEMOTION and pg.mouse.get_focused():
-                    mouse_x, mouse_y = event.pos
-                    hovered_i, hovered_j = self.position_to_cell(mouse_x, mouse_y)
-
-                    # Can also select cells by dragging over them whilst
-                    # holding left mouse button.
-                    if pg.mouse.get_pressed() == (1, 0, 0):
-                        self.grid_state[hovered_i][hovered_j] = True
-                    update_screen = True
-
                 elif event.type == pg.MOUSEBUTTONDOWN and event.button == pg.BUTTON_LEFT:
-                    self.grid_state[hovered_i][hovered_j] ^= True
-                    update_screen = True
-
-            # We don't need to redraw the screen if nothing has changed.
-            if update_screen:
-                self.surface.fill(self.BACKGROUND_COLOUR)
-                self.fill_live_cells()
-                if not self.grid_state[hovered_i][hovered_j]:
-                    self.fill_cell(hovered_i, hovered_j)
-                self.draw_grid_lines()
-                pg.display.update()
-                update_screen = False
-
-            self.clock.tick(self.fps)
+                    i, j = position_to_cell(*event.pos)
+                    grid_state[i, j] ^= 1
+                    # The clicked cell is drawn hovered, so record it as such
+                    # for the next motion event to un-hover.
+                    hovered_cell = (i, j)
+                    display_update(redraw_cell(i, j, hovered=True))
+
+            dirty_rects = []
+            motion_events = event_get(pg.MOUSEMOTION)
+            for event in motion_events:
+                # Cells can also be selected by dragging over them whilst
+                # holding the left mouse button.
+                if event.buttons[0]:
+                    i, j = position_to_cell(*event.pos)
+                    if not grid_state[i, j]:
+                        grid_state[i, j] = 1
+                        dirty_rects.append(redraw_cell(i, j))
+
+            # Only the most recent motion event matters for the hover
+            # preview, so only the two cells it involves are redrawn.
+            if motion_events and pg.mouse.get_focused():
+                i, j = position_to_cell(*motion_events[-1].pos)
+                if (i, j) != hovered_cell:
+                    dirty_rects.append(redraw_cell(i, j, hovered=True))
+                    if hovered_cell is not None:
+                        dirty_rects.append(redraw_cell(*hovered_cell))
+                    hovered_cell = (i, j)
+
+            if dirty_rects:
+                display_update(dirty_rects)
+
+            clock_tick(fps)
 
     def position_to_cell(self, x: int, y: int) -> Tuple[int, int]:
         """Return the cell of the grid that contains the position (`x`, `y`).
@@ -99,54 +185,114 @@ class GameOfLife:
         """
         return y // self.cell_size, x // self.cell_size
 
-    def draw_grid_lines(self) -> None:
-        """Draw the grid lines onto the surface."""
+    def _render_grid_lines(self) -> pg.Surface:
+        """Render the grid lines onto a transparent overlay surface.
+
+        Returns:
+            The overlay surface.
+        """
+        overlay = pg.Surface((self.window_size, self.window_size), pg.SRCALPHA)
         for i in range(self.grid_size):
             start_pos = (i * self.cell_size - 1, 0)
             end_pos = (i * self.cell_size - 1, self.window_size)
-            pg.draw.line(self.surface, self.GRID_LINE_COLOUR, start_pos, end_pos, 2)
+            pg.draw.line(overlay, GRID_LINE_COLOUR, start_pos, end_pos, 2)
         for j in range(self.grid_size):
             start_pos = (0, j * self.cell_size - 1)
             end_pos = (self.window_size, j * self.cell_size - 1)
-            pg.draw.line(self.surface, self.GRID_LINE_COLOUR, start_pos, end_pos, 2)
+            pg.draw.line(overlay, GRID_LINE_COLOUR, start_pos, end_pos, 2)
+        return overlay
 
-    def fill_live_cells(self) -> None:
-        """Draw the live cells in the grid to the surface."""
-        for i, row in enumerate(self.grid_state):
-            for j, cell_alive in enumerate(row):
-                if cell_alive:
-                    self.fill_cell(i, j)
+    def draw_grid_lines(self) -> None:
+        """Draw the pre-rendered grid line overlay onto the surface."""
+        self.surface.blit(self._grid_line_overlay, (0, 0))
 
-    def fill_cell(self, i: int, j: int) -> None:
-        """Draw a live cell at position (`i`, `j`).
+    def fill_live_cells(self) -> None:
+        """Draw every cell in the grid to the surface by scaling a
+        one-pixel-per-cell image of the grid up to its size on screen."""
+        np.take(self._cell_colours, self.grid_state.T, axis=0, out=self._cell_rgb)
+        pg.surfarray.blit_array(self._cell_surface, self._cell_rgb)
+        pg.transform.scale(self._cell_surface, self._scaled_cell_surface.get_size(),
+                           self._scaled_cell_surface)
+        self.surface.blit(self._scaled_cell_surface, (0, 0))
+
+    def redraw_cell(self, i: int, j: int, hovered: bool = False) -> pg.Rect:
+        """Redraw the cell (`i`, `j`) onto the surface. A hovered cell is
+        drawn as if it were live.
 
-        Arg:
+        Args:
             i: Row of the cell.
             j: Column of the cell.
+            hovered: Whether the mouse is hovering over the cell.
+
+        Returns:
+            The rect covering the cell, for passing to `pg.display.update`.
         """
-        left, top = j * self.cell_size, i * self.cell_size
-        rect = [left, top, self.cell_size, self.cell_size]
-        pg.draw.rect(self.surface, self.LIVE_CELL_COLOUR, rect)
+        rect = self._cell_rects[i][j]
+        if hovered or self.grid_state[i, j]:
+            self.surface.blit(self._live_cell_surface, rect)
+        else:
+            self.surface.fill(BACKGROUND_COLOUR, rect)
+        # Restore the portion of the grid lines covering the cell.
+        self.surface.blit(self._grid_line_overlay, rect, rect)
+        return rect
 
     def main_loop(self) -> None:
         """Evolve and draw the grid indefinitely until the the window is
         closed or escape is pressed."""
-        time_since_last_update = 0
+        # The mouse does nothing during the evolution, so stop its events
+        # reaching the queue at all.
+        pg.event.set_blocked((pg.MOUSEMOTION, pg.MOUSEBUTTONDOWN))
+
+        self.surface.fill(BACKGROUND_COLOUR)
+        self.fill_live_cells()
+        self.draw_grid_lines()
+        pg.display.update()
+        np.copyto(self._drawn_grid_state, self.grid_state)
+
+        # Bind the names used every iteration to locals to avoid the repeated
+        # attribute lookups in the loop.
+        event_get = pg.event.get
+        evolve_grid = self.evolve_grid
+        redraw_changed_cells = self.redraw_changed_cells
+        evolution_period_ms = 1000 / self.evolution_rate
+        clock_tick = self.clock.tick
+        fps = self.fps
+
+        time_since_last_update = 0.0
         while True:
-            for event in pg.event.get():
+            for event in event_get((pg.QUIT, pg.KEYDOWN)):
                 if event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
                     pg.quit()
                     sys.exit()
 
-            if time_since_last_update > (1 / self.evolution_rate):
-                time_since_last_update = 0
-                self.evolve_grid()
-                self.surface.fill(self.BACKGROUND_COLOUR)
-                self.fill_live_cells()
-                self.draw_grid_lines()
-                pg.display.update()
-
-            time_since_last_update += self.clock.tick(self.fps) / 1000
+            # Subtracting the period rather than resetting to zero carries
+            # the fractional remainder of each tick over, so the evolution
+            # keeps to the requested rate over time. A slow frame can owe
+            # more than one evolution step; the display is only redrawn once
+            # after catching up.
+            evolved = False
+            while time_since_last_update >= evolution_period_ms:
+                time_since_last_update -= evolution_period_ms
+                evolve_grid()
+                evolved = True
+            if evolved:
+                redraw_changed_cells()
+
+            time_since_last_update += clock_tick(fps)
+
+    def redraw_changed_cells(self) -> None:
+        """Redraw the cells which changed since the last redraw and update
+        only those regions of the display. Does nothing if no cells changed,
+        so stable patterns cost nothing to display."""
+        np.not_equal(self._drawn_grid_state, self.grid_state, out=self._changed_mask)
+        changed_cells = np.argwhere(self._changed_mask)
+        if not changed_cells.size:
+            return
+        self.fill_live_cells()
+        self.draw_grid_lines()
+        dirty_rects = [self._cell_rects[i][j] for i, j in changed_cells]
+        pg.display.update(dirty_rects)
+        np.copyto(self._drawn_grid_state, self.grid_state)
 
     def evolve_grid(self) -> None:
         """Evolve the grid by one step.
@@ -161,50 +307,17 @@ class GameOfLife:
             4. Any dead cell with exactly three live neighbours becomes a live
                cell, as if by reproduction.
         """
-        new_grid_state = []
-        for i, row in enumerate(self.grid_state):
-            new_row = []
-            for j, cell_state in enumerate(row):
-                alive = self.live_neighbours(i, j)
-                new_state = False
-                if (cell_state and 2 <= alive <= 3) or alive == 3:
-                    new_state = True
-                new_row.append(new_state)
-            new_grid_state.append(new_row)
-
-        self.grid_state = new_grid_state
-
-    def live_neighbours(self, i: int, j: int) -> int:
-        """Return the number of live cells neighbouring the cell (`i`, `j`)
-        in the grid.
-
-        Args:
-            i: Row of cell.
-            j: Column of cell.
-
-        Returns:
-            Number of live neighbours.
-        """
-        neighbours = self.neighbouring_cells(i, j)
-        return sum(self.grid_state[l][m] for l, m in neighbours)
-
-    def neighbouring_cells(self, i: int, j: int) -> List[Tuple[int, int]]:
-        """Return the grid positions of the cells neighbouring
-        (above/below/diagonal) the cell (`i`, `j`).
-
-        Args:
-            i: Row of cell.
-            j: Column of cell.
-
-        Returns:
-            List of neighbouring cells.
-        """
-        return [
-            (l, m)
-            for l in range(i - 1, i + 2) for m in range(j - 1, j + 2)
-            if l in range(self.grid_size) and m in range(self.grid_size)
-            and (l, m) != (i, j)
-        ]
+        # Cells further than one step from a live cell stay dead, so only
+        # the bounding box of the live cells (grown by one cell) needs
+        # evolving.
+        self._next_grid_state[:] = 0
+        live_rows = np.flatnonzero(self.grid_state.any(axis=1, out=self._live_row_mask))
+        if live_rows.size:
+            live_columns = np.flatnonzero(self.grid_state.any(axis=0, out=self._live_column_mask))
+            rows = slice(max(live_rows[0] - 1, 0), min(live_rows[-1] + 2, self.grid_size))
+            columns = slice(max(live_columns[0] - 1, 0), min(live_columns[-1] + 2, self.grid_size))
+            _evolve(self.grid_state[rows, columns], self._next_grid_state[rows, columns])
+        self.grid_state, self._next_grid_state = self._next_grid_state, self.grid_state
 
 
 parser = argparse.ArgumentParser(